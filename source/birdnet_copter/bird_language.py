@@ -25,6 +25,9 @@ from .config import BIRDNET_LABELS_PATH, BIRD_LANGUAGES_PATH
 _label_cache: dict[str, dict[str, str]] = {}
 # Key: language code, Value: {scientific_name: local_name}
 
+_languages_cache: tuple[tuple, list[str]] | None = None
+# (directory mtimes, sorted language codes) – reused until a label dir changes
+
 
 # ---------------------------------------------------------------------------
 # Public API
@@ -37,10 +40,19 @@ def get_available_languages() -> list[str]:
     Union of *.txt files found in BIRD_LANGUAGES_PATH and BIRDNET_LABELS_PATH.
     Files must follow the naming convention  <language_code>.txt.
 
+    The result is cached and only rescanned when the modification time of
+    one of the label directories changes (file added, removed or renamed).
+
     Returns:
         Sorted list of language code strings (e.g. ['cs', 'de', 'en_uk', ...]).
         Empty list if neither directory exists.
     """
+    global _languages_cache
+
+    dir_stamp = tuple(_dir_mtime(d) for d in (BIRD_LANGUAGES_PATH, BIRDNET_LABELS_PATH))
+    if _languages_cache is not None and _languages_cache[0] == dir_stamp:
+        return list(_languages_cache[1])
+
     codes: set[str] = set()
 
     for label_dir in (BIRD_LANGUAGES_PATH, BIRDNET_LABELS_PATH):
@@ -52,7 +64,8 @@ def get_available_languages() -> list[str]:
 
     languages = sorted(codes)
     logger.debug(f"Available bird-name languages: {languages}")
-    return languages
+    _languages_cache = (dir_stamp, languages)
+    return list(languages)
 
 
 def load_labels(language: str) -> dict[str, str]:
@@ -108,6 +121,16 @@ def translate(scientific_name: str, language: str) -> str:
 # Internal helpers
 # ---------------------------------------------------------------------------
 
+def _dir_mtime(label_dir: Path | None) -> int | None:
+    """Return st_mtime_ns of label_dir, or None if unset or missing."""
+    if label_dir is None:
+        return None
+    try:
+        return label_dir.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
 def _load_from_dirs(language: str) -> dict[str, str]:
     """
     Try to load a label file for *language* from the configured directories.
@@ -104,31 +104,35 @@ def analyze_file(
     # Convert to DataFrame
     df = result.to_dataframe()
     
-    # Convert to detections list
+    # Convert to detections list.
+    # Columns are pulled out once as plain Python lists (no per-row Series
+    # like df.iterrows()); each species label is split only once per file.
     detections = []
-    
-    for idx, row in df.iterrows():
-        confidence = float(row['confidence'])
-        
+    names: dict[str, tuple[str, str]] = {}
+
+    for species_name, confidence, start_time, end_time in zip(
+        df["species_name"].tolist(),
+        df["confidence"].tolist(),
+        df["start_time"].tolist(),
+        df["end_time"].tolist(),
+    ):
         # Parse species_name format: "Scientific_Common Name"
-        species_name = row["species_name"]
-        if '_' in species_name:
-            scientific_name, common_name = species_name.split('_', 1)
-        else:
-            # Fallback if format is unexpected
-            scientific_name = species_name
-            common_name = species_name
-        
-        # Parse time values (should be floats already)
-        start_time = float(row["start_time"]) if row["start_time"] is not None else 0.0
-        end_time = float(row["end_time"]) if row["end_time"] is not None else 0.0
-        
+        split = names.get(species_name)
+        if split is None:
+            if '_' in species_name:
+                split = tuple(species_name.split('_', 1))
+            else:
+                # Fallback if format is unexpected
+                split = (species_name, species_name)
+            names[species_name] = split
+        scientific_name, common_name = split
+
         detections.append({
             'scientific_name': scientific_name,
             'common_name': common_name,
-            'confidence': confidence,
-            'start_time': start_time,
-            'end_time': end_time
+            'confidence': float(confidence),
+            'start_time': float(start_time) if start_time is not None else 0.0,
+            'end_time': float(end_time) if end_time is not None else 0.0
         })
     
     logger.info(f"BirdNET found {len(detections)} detections in {Path(file_path).name}")
@@ -98,15 +98,39 @@ def init_database(db_path: str):
     logger.info(f"Database initialized: {db_path}")
 
 
-def insert_metadata(db_path: str, metadata: dict):
+def open_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Open a long-lived writer connection for one scan run.
+
+    The insert functions below accept it via their optional ``conn``
+    argument, so a folder scan pays sqlite3_open once instead of per file.
+    WAL is already persistent from init_database; synchronous=NORMAL
+    only syncs at checkpoints, which is safe in WAL mode.
+
+    Args:
+        db_path: Path to SQLite database
+
+    Returns:
+        Open connection; the caller closes it.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def insert_metadata(db_path: str, metadata: dict,
+                    conn: sqlite3.Connection | None = None):
     """
     Insert file metadata into database.
     
     Args:
         db_path: Path to SQLite database
         metadata: Metadata dictionary from audiomoth_import
+        conn: Optional open connection (see open_connection); not closed here
     """
-    conn = sqlite3.connect(db_path)
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     try:
@@ -140,7 +164,8 @@ def insert_metadata(db_path: str, metadata: dict):
         logger.error(f"Error inserting metadata for {metadata['filename']}: {e}")
         conn.rollback()
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
 
 
 
@@ -149,6 +174,7 @@ def batch_insert_detections(
     filename: str,
     metadata: dict,
     detections: list[dict],
+    conn: sqlite3.Connection | None = None,
 ):
     """
     Insert all detections from one file in a single transaction.
@@ -158,42 +184,45 @@ def batch_insert_detections(
         filename:   Original WAV filename
         metadata:   File metadata dict
         detections: List of detection dicts from BirdNET.
+        conn:       Optional open connection (see open_connection); not closed here
     """
     if not detections:
         return
 
-    conn = sqlite3.connect(db_path)
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     try:
-        cursor.execute("BEGIN TRANSACTION")
+        ts_utc   = metadata['timestamp_utc']
+        ts_local = metadata['timestamp_local']
+        tz       = metadata['timezone']
 
+        rows = []
         for detection in detections:
-            start_s = detection['start_time']
-            end_s   = detection['end_time']
-
-            seg_start_utc   = metadata['timestamp_utc']   + timedelta(seconds=start_s)
-            seg_end_utc     = metadata['timestamp_utc']   + timedelta(seconds=end_s)
-            seg_start_local = metadata['timestamp_local'] + timedelta(seconds=start_s)
-            seg_end_local   = metadata['timestamp_local'] + timedelta(seconds=end_s)
-
-            cursor.execute("""
-                INSERT INTO detections
-                (filename, segment_start_utc, segment_start_local,
-                 segment_end_utc, segment_end_local, timezone,
-                 scientific_name, confidence)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+            start = timedelta(seconds=detection['start_time'])
+            end   = timedelta(seconds=detection['end_time'])
+            rows.append((
                 filename,
-                seg_start_utc.isoformat(),
-                seg_start_local.isoformat(),
-                seg_end_utc.isoformat(),
-                seg_end_local.isoformat(),
-                metadata['timezone'],
+                (ts_utc   + start).isoformat(),
+                (ts_local + start).isoformat(),
+                (ts_utc   + end).isoformat(),
+                (ts_local + end).isoformat(),
+                tz,
                 detection['scientific_name'],
                 detection['confidence'],
             ))
 
+        cursor.execute("BEGIN TRANSACTION")
+        cursor.executemany("""
+            INSERT INTO detections
+            (filename, segment_start_utc, segment_start_local,
+             segment_end_utc, segment_end_local, timezone,
+             scientific_name, confidence)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
         conn.commit()
         logger.debug(f"Batch inserted {len(detections)} detections for {filename}")
 
@@ -201,7 +230,8 @@ def batch_insert_detections(
         logger.error(f"Error batch inserting detections for {filename}: {e}")
         conn.rollback()
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
 
 
 
@@ -247,7 +277,8 @@ def create_indices(db_path: str):
         conn.close()
 
 
-def set_file_status(db_path: str, filename: str, status: str):
+def set_file_status(db_path: str, filename: str, status: str,
+                    conn: sqlite3.Connection | None = None):
     """
     Mark a file as completed in processing_status.
 
@@ -255,8 +286,11 @@ def set_file_status(db_path: str, filename: str, status: str):
         db_path: Path to SQLite database
         filename: Filename to mark as completed
         status: Only 'completed' is valid
+        conn: Optional open connection (see open_connection); not closed here
     """
-    conn = sqlite3.connect(db_path)
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(db_path)
     try:
         conn.execute(
             "INSERT OR REPLACE INTO processing_status (filename, completed_at) "
@@ -268,7 +302,8 @@ def set_file_status(db_path: str, filename: str, status: str):
         logger.error(f"Error setting status for {filename}: {e}")
         conn.rollback()
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
 
         
         
@@ -290,9 +325,9 @@ def rebuild_detections(db_path: str, filenames: list[str] | None = None) -> None
             cursor.execute("DELETE FROM detections")
             cursor.execute("DELETE FROM processing_status")
         else:
-            for fn in filenames:
-                cursor.execute("DELETE FROM detections WHERE filename = ?", (fn,))
-                cursor.execute("DELETE FROM processing_status WHERE filename = ?", (fn,))
+            params = [(fn,) for fn in filenames]
+            cursor.executemany("DELETE FROM detections WHERE filename = ?", params)
+            cursor.executemany("DELETE FROM processing_status WHERE filename = ?", params)
         conn.commit()
         logger.info(f"Rebuild: detections cleared for "
                     f"{'all files' if filenames is None else len(filenames)} file(s): {db_path}")
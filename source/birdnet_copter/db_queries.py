@@ -1,34 +1,92 @@
 """
 Database query functions for BirdNET tools.
-Read-only access to analysis databases.
+Read-only access to analysis databases (except set_analysis_config and
+create_species_list_table, which use a read-write connection).
 """
 
 import sqlite3
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Iterator, Tuple
 from datetime import datetime, time
 from loguru import logger
 
 # Species list confidence threshold
 CONFIDENCE_THRESHOLD_HIGH = 0.7  # Detections above this are "high confidence"
 
+# Busy timeout for write connections: how long BEGIN IMMEDIATE waits for a lock
+LOCK_TIMEOUT_S = 30.0
 
-def get_db_connection(db_path: Path) -> sqlite3.Connection:
+
+def get_db_connection(db_path: Path, timeout: float = 5.0) -> sqlite3.Connection:
     """
     Open database connection with WAL mode.
 
     Args:
         db_path: Path to SQLite database
+        timeout: Busy timeout in seconds while the database is locked
 
     Returns:
         SQLite connection with Row factory for dict-like access
     """
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, timeout=timeout)
     conn.execute("PRAGMA journal_mode=WAL")
     conn.row_factory = sqlite3.Row
     return conn
 
 
+def get_ro_connection(db_path: Path) -> sqlite3.Connection:
+    """
+    Open database connection for read-only use.
+
+    Opens with a mode=rw URI (does not create a missing database) and sets
+    PRAGMA query_only, so no statement can modify the database. mode=ro is
+    deliberately not used: a mode=ro reader cannot remove the -wal/-shm
+    files on close, which would leave them behind in every browsed
+    recording folder. Used by all read functions in this module;
+    get_db_connection is kept for the writers (set_analysis_config,
+    create_species_list_table).
+
+    Temp B-trees (GROUP BY, ORDER BY) are kept in memory and the page cache
+    is raised to 64 MiB; it is only allocated as pages are actually read.
+
+    Args:
+        db_path: Path to SQLite database
+
+    Returns:
+        SQLite connection with Row factory for dict-like access
+
+    Raises:
+        sqlite3.OperationalError: If the database file does not exist
+    """
+    uri = f"{Path(db_path).absolute().as_uri()}?mode=rw"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.execute("PRAGMA query_only=ON")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _db_stamp(db_path: Path) -> tuple:
+    """
+    Change marker for a database: (mtime_ns, size) of the DB and its -wal file.
+
+    In WAL mode commits only touch the -wal file until a checkpoint, so both
+    files are included. Used as part of the lru_cache key of read functions
+    whose results only change when the database is written.
+    """
+    db_path = Path(db_path)
+    stamp = []
+    for p in (db_path, db_path.with_name(db_path.name + '-wal')):
+        try:
+            st = p.stat()
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
 def get_analysis_config(db_path: Path, key: str) -> Optional[str]:
     """
     Read value from analysis_config table.
@@ -40,7 +98,7 @@ def get_analysis_config(db_path: Path, key: str) -> Optional[str]:
     Returns:
         Config value or None if not found
     """
-    conn = get_db_connection(db_path)
+    conn = get_ro_connection(db_path)
     try:
         cursor = conn.execute(
             "SELECT value FROM analysis_config WHERE key = ?",
@@ -89,7 +147,29 @@ def get_all_metadata(db_path: Path) -> List[Dict]:
         Liste von Dicts mit allen Metadata-Feldern
     """
     try:
-        conn = get_db_connection(db_path)
+        return list(iter_all_metadata(db_path))
+    except Exception as e:
+        logger.error(f"Failed to load metadata: {e}")
+        return []
+
+
+def iter_all_metadata(db_path: Path) -> Iterator[Dict]:
+    """
+    Liefert die File-Metadaten zeilenweise als Generator.
+
+    Die Zeilen werden direkt vom Cursor gestreamt – Aufrufer, die nur
+    zählen oder aggregieren, halten nie die ganze Tabelle im Speicher.
+    Die Verbindung wird geschlossen, sobald der Generator erschöpft oder
+    geschlossen ist.
+
+    Yields:
+        Dict mit allen Metadata-Feldern, sortiert nach timestamp_local
+
+    Raises:
+        sqlite3.Error: Bei DB-Fehlern (im Gegensatz zu get_all_metadata)
+    """
+    conn = get_ro_connection(db_path)
+    try:
         query = """
             SELECT
                 filename,
@@ -110,13 +190,10 @@ def get_all_metadata(db_path: Path) -> List[Dict]:
             FROM metadata
             ORDER BY timestamp_local ASC
         """
-        cursor = conn.execute(query)
-        results = [dict(row) for row in cursor.fetchall()]
+        for row in conn.execute(query):
+            yield dict(row)
+    finally:
         conn.close()
-        return results
-    except Exception as e:
-        logger.error(f"Failed to load metadata: {e}")
-        return []
 
 
 def species_list_exists(db_path: Path) -> bool:
@@ -130,24 +207,34 @@ def species_list_exists(db_path: Path) -> bool:
         True if table exists, False otherwise
     """
     try:
-        conn = get_db_connection(db_path)
-        cursor = conn.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='species_list'"
-        )
-        exists = cursor.fetchone() is not None
-        conn.close()
-        return exists
+        conn = get_ro_connection(db_path)
+        try:
+            return _species_list_exists(conn)
+        finally:
+            conn.close()
     except Exception as e:
         logger.error(f"Failed to check species_list existence: {e}")
         return False
 
 
+def _species_list_exists(conn: sqlite3.Connection) -> bool:
+    """species_list check on an already open connection (no extra connect)."""
+    cursor = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='species_list'"
+    )
+    return cursor.fetchone() is not None
+
+
 def create_species_list_table(db_path: Path) -> bool:
     """
     Create/recreate species_list table and populate with unique species from detections.
     Includes high/low confidence counts and score for intelligent sorting.
 
     Drops existing table if present, then creates new one with all unique species.
+    DROP, CREATE and INSERT run in one BEGIN IMMEDIATE transaction, so the
+    write lock is taken up front instead of being upgraded mid-transaction
+    while readers hold the database. A locked database is waited for via
+    the busy timeout (LOCK_TIMEOUT_S).
 
     Args:
         db_path: Path to SQLite database
@@ -156,36 +243,43 @@ def create_species_list_table(db_path: Path) -> bool:
         True if successful, False on error
     """
     try:
-        conn = get_db_connection(db_path)
-
-        conn.execute("DROP TABLE IF EXISTS species_list")
-
-        conn.execute("""
-            CREATE TABLE species_list (
-                scientific_name TEXT PRIMARY KEY,
-                count_high INTEGER,
-                count_low INTEGER,
-                score REAL
-            )
-        """)
-
-        conn.execute(f"""
-            INSERT INTO species_list (scientific_name, count_high, count_low, score)
-            SELECT
-                scientific_name,
-                SUM(CASE WHEN confidence >= {CONFIDENCE_THRESHOLD_HIGH} THEN 1 ELSE 0 END),
-                SUM(CASE WHEN confidence < {CONFIDENCE_THRESHOLD_HIGH} THEN 1 ELSE 0 END),
-                SUM(confidence * confidence * confidence * confidence) AS score
-            FROM detections
-            GROUP BY scientific_name
-            ORDER BY score DESC
-        """)
-
-        conn.commit()
-
-        cursor = conn.execute("SELECT COUNT(*) FROM species_list")
-        count = cursor.fetchone()[0]
-        conn.close()
+        conn = get_db_connection(db_path, timeout=LOCK_TIMEOUT_S)
+        conn.isolation_level = None  # explicit BEGIN/COMMIT below
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DROP TABLE IF EXISTS species_list")
+
+                conn.execute("""
+                    CREATE TABLE species_list (
+                        scientific_name TEXT PRIMARY KEY,
+                        count_high INTEGER,
+                        count_low INTEGER,
+                        score REAL
+                    )
+                """)
+
+                conn.execute(f"""
+                    INSERT INTO species_list (scientific_name, count_high, count_low, score)
+                    SELECT
+                        scientific_name,
+                        SUM(CASE WHEN confidence >= {CONFIDENCE_THRESHOLD_HIGH} THEN 1 ELSE 0 END),
+                        SUM(CASE WHEN confidence < {CONFIDENCE_THRESHOLD_HIGH} THEN 1 ELSE 0 END),
+                        SUM(confidence * confidence * confidence * confidence) AS score
+                    FROM detections
+                    GROUP BY scientific_name
+                    ORDER BY score DESC
+                """)
+
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            cursor = conn.execute("SELECT COUNT(*) FROM species_list")
+            count = cursor.fetchone()[0]
+        finally:
+            conn.close()
 
         logger.info(f"Created species_list table with {count} unique species")
         return True
@@ -199,38 +293,56 @@ def get_species_count(db_path: Path) -> int:
     """
     Get number of species in species_list table.
 
+    Result is cached until the database changes (see _db_stamp).
+
     Args:
         db_path: Path to SQLite database
 
     Returns:
         Number of species, or 0 if table doesn't exist
     """
-    if not species_list_exists(db_path):
-        return 0
     try:
-        conn = get_db_connection(db_path)
-        cursor = conn.execute("SELECT COUNT(*) FROM species_list")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return _cached_species_count(Path(db_path), _db_stamp(db_path))
     except Exception as e:
         logger.error(f"Failed to get species count: {e}")
         return 0
 
 
+@lru_cache(maxsize=8)
+def _cached_species_count(db_path: Path, stamp: tuple) -> int:
+    conn = get_ro_connection(db_path)
+    try:
+        if not _species_list_exists(conn):
+            return 0
+        cursor = conn.execute("SELECT COUNT(*) FROM species_list")
+        return cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+
 def get_available_species(db_path: Path) -> List[str]:
     """
     Get list of all available species from species_list table.
     Falls back to detections table if species_list doesn't exist.
 
+    Result is cached until the database changes (see _db_stamp).
+
     Returns:
         List of scientific_name strings, sorted alphabetically.
         Translation to local names is done by the caller via labels dict.
     """
     try:
-        conn = get_db_connection(db_path)
+        return list(_cached_available_species(Path(db_path), _db_stamp(db_path)))
+    except Exception as e:
+        logger.error(f"Failed to get available species: {e}")
+        return []
+
 
-        if species_list_exists(db_path):
+@lru_cache(maxsize=8)
+def _cached_available_species(db_path: Path, stamp: tuple) -> Tuple[str, ...]:
+    conn = get_ro_connection(db_path)
+    try:
+        if _species_list_exists(conn):
             query = """
                 SELECT scientific_name
                 FROM species_list
@@ -244,13 +356,9 @@ def get_available_species(db_path: Path) -> List[str]:
             """
 
         cursor = conn.execute(query)
-        results = [row[0] for row in cursor.fetchall()]
+        return tuple(row[0] for row in cursor.fetchall())
+    finally:
         conn.close()
-        return results
-
-    except Exception as e:
-        logger.error(f"Failed to get available species: {e}")
-        return []
 
 
 def get_species_list_with_counts(
@@ -260,6 +368,9 @@ def get_species_list_with_counts(
     """
     Get complete species list with detection counts and score.
 
+    The species_list rows are cached until the database changes
+    (see _db_stamp); each call returns fresh dicts the caller may modify.
+
     Args:
         db_path: Path to SQLite database
         labels:  Optional dict {scientific_name: local_name} from bird_language.
@@ -276,12 +387,32 @@ def get_species_list_with_counts(
 
         Returns empty list if species_list table doesn't exist.
     """
-    if not species_list_exists(db_path):
-        logger.warning("species_list table does not exist")
+    try:
+        rows = _cached_species_list(Path(db_path), _db_stamp(db_path))
+        if rows is None:
+            logger.warning("species_list table does not exist")
+            return []
+
+        results = [dict(r) for r in rows]
+
+        if labels is not None:
+            for r in results:
+                r['local_name'] = labels.get(r['scientific_name'], r['scientific_name'])
+
+        return results
+
+    except Exception as e:
+        logger.error(f"Failed to get species list with counts: {e}")
         return []
 
+
+@lru_cache(maxsize=8)
+def _cached_species_list(db_path: Path, stamp: tuple) -> Optional[Tuple[Dict, ...]]:
+    """species_list rows ordered by score, or None if the table is missing."""
+    conn = get_ro_connection(db_path)
     try:
-        conn = get_db_connection(db_path)
+        if not _species_list_exists(conn):
+            return None
         query = """
             SELECT
                 scientific_name,
@@ -291,20 +422,14 @@ def get_species_list_with_counts(
             FROM species_list
             ORDER BY score DESC
         """
+        conn.row_factory = None  # plain tuples; dicts are built via zip below
         cursor = conn.execute(query)
-        results = [dict(row) for row in cursor.fetchall()]
+        cols = tuple(d[0] for d in cursor.description)
+        return tuple(dict(zip(cols, row)) for row in cursor.fetchall())
+    finally:
         conn.close()
 
-        if labels is not None:
-            for r in results:
-                r['local_name'] = labels.get(r['scientific_name'], r['scientific_name'])
-
-        return results
 
-    except Exception as e:
-        logger.error(f"Failed to get species list with counts: {e}")
-        return []
-    
 def get_detection_by_id(
     db_path: Path,
     detection_id: int,
@@ -322,7 +447,7 @@ def get_detection_by_id(
     Returns:
         Dict with detection + metadata, or None if not found.
     """
-    conn = get_db_connection(db_path)
+    conn = get_ro_connection(db_path)
     try:
         cursor = conn.execute("""
             SELECT
@@ -373,7 +498,7 @@ def get_metadata_by_filename(db_path: Path, filename: str) -> Optional[Dict]:
     Returns:
         Dict with metadata or None if not found
     """
-    conn = get_db_connection(db_path)
+    conn = get_ro_connection(db_path)
     try:
         cursor = conn.execute(
             "SELECT * FROM metadata WHERE filename = ?", (filename,)
@@ -417,7 +542,7 @@ def query_detections(
     Returns:
         List of detection dicts with metadata.
     """
-    conn = get_db_connection(db_path)
+    conn = get_ro_connection(db_path)
     try:
         query = """
             SELECT
@@ -484,8 +609,12 @@ def query_detections(
         query += " LIMIT ? OFFSET ?"
         params.extend([limit, offset])
 
+        # Plain tuples + one fixed key tuple: avoids the per-column
+        # Mapping lookups of dict(sqlite3.Row) on large result sets
+        conn.row_factory = None
         cursor = conn.execute(query, params)
-        results = [dict(row) for row in cursor.fetchall()]
+        cols = tuple(d[0] for d in cursor.description)
+        results = [dict(zip(cols, row)) for row in cursor.fetchall()]
 
         if labels is not None:
             for r in results:
@@ -498,6 +627,85 @@ def query_detections(
         conn.close()
 
 
+def get_detection_time_slots(
+    db_path: Path,
+    species: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    min_confidence: Optional[float] = None,
+) -> List[Tuple[str, int, int, float]]:
+    """
+    Count detections per (day, 30-minute slot) in a single grouped query.
+
+    Uses the same filters as query_detections, but buckets the rows in SQL
+    instead of returning every detection. Like the JOIN in query_detections,
+    only detections with a metadata row are counted, so every heatmap cell
+    matches what the detail dialog lists. Slot index is hour * 2 + 1 for
+    minutes >= 30 (0–47), read from the fixed positions of the ISO string
+    in segment_start_local.
+
+    Args:
+        db_path:        Path to SQLite database
+        species:        Scientific name filter (partial match)
+        date_from:      Start date (inclusive, from 00:00:00)
+        date_to:        End date (inclusive, until 23:59:59)
+        min_confidence: Minimum confidence threshold
+
+    Returns:
+        List of (date_str "YYYY-MM-DD", slot_idx, count, sum_confidence).
+    """
+    query = """
+        SELECT
+            substr(segment_start_local, 1, 10) AS day,
+            CAST(substr(segment_start_local, 12, 2) AS INTEGER) * 2
+                + (CAST(substr(segment_start_local, 15, 2) AS INTEGER) >= 30) AS slot,
+            COUNT(*),
+            SUM(confidence)
+        FROM detections d
+        WHERE EXISTS (
+            SELECT 1 FROM metadata m
+            WHERE m.filename = d.filename
+              AND m.source_db_id = d.source_db_id
+        )
+    """
+    params = []
+
+    if species:
+        query += " AND scientific_name LIKE ?"
+        params.append(f"%{species}%")
+
+    if date_from:
+        start = datetime.combine(
+            date_from.date() if isinstance(date_from, datetime) else date_from,
+            time(0, 0, 0),
+        )
+        query += " AND segment_start_local >= ?"
+        params.append(start.isoformat())
+
+    if date_to:
+        end = datetime.combine(
+            date_to.date() if isinstance(date_to, datetime) else date_to,
+            time(23, 59, 59),
+        )
+        query += " AND segment_start_local <= ?"
+        params.append(end.isoformat())
+
+    if min_confidence is not None:
+        query += " AND confidence >= ?"
+        params.append(min_confidence)
+
+    query += " GROUP BY day, slot"
+
+    conn = get_ro_connection(db_path)
+    try:
+        conn.row_factory = None
+        rows = conn.execute(query, params).fetchall()
+        logger.debug(f"Time-slot query returned {len(rows)} non-empty cells")
+        return rows
+    finally:
+        conn.close()
+
+
 def format_score_with_two_significant_digits(score: float, min_score: float) -> str:
     """
     Format score with adaptive precision.
@@ -543,12 +751,26 @@ def get_recording_date_range(
     """
     Get the date range of recordings in the database.
 
+    Result is cached until the database changes (see _db_stamp).
+
     Returns:
         Tuple of (min_date, max_date) as datetime objects.
         Returns (None, None) if no recordings found.
     """
     try:
-        conn = get_db_connection(db_path)
+        return _cached_recording_date_range(Path(db_path), _db_stamp(db_path))
+    except Exception as e:
+        logger.error(f"Failed to get recording date range: {e}")
+        return (None, None)
+
+
+@lru_cache(maxsize=8)
+def _cached_recording_date_range(
+    db_path: Path,
+    stamp: tuple,
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    conn = get_ro_connection(db_path)
+    try:
         query = """
             SELECT
                 MIN(timestamp_local) as min_date,
@@ -557,18 +779,15 @@ def get_recording_date_range(
         """
         cursor = conn.execute(query)
         row    = cursor.fetchone()
+    finally:
         conn.close()
 
-        if row and row['min_date'] and row['max_date']:
-            return (
-                datetime.fromisoformat(row['min_date']),
-                datetime.fromisoformat(row['max_date']),
-            )
-        return (None, None)
-
-    except Exception as e:
-        logger.error(f"Failed to get recording date range: {e}")
-        return (None, None)
+    if row and row['min_date'] and row['max_date']:
+        return (
+            datetime.fromisoformat(row['min_date']),
+            datetime.fromisoformat(row['max_date']),
+        )
+    return (None, None)
 
 
 def search_species_in_list(
@@ -596,13 +815,16 @@ def search_species_in_list(
         extracted by splitting on ' (' when labels are present.
         Returns empty list if no matches or table doesn't exist.
     """
-    if not search_term or not species_list_exists(db_path):
+    if not search_term:
         return []
 
     term_lower = search_term.lower()
 
     try:
-        conn = get_db_connection(db_path)
+        conn = get_ro_connection(db_path)
+        if not _species_list_exists(conn):
+            conn.close()
+            return []
 
         if labels is not None:
             # Fetch more candidates so local-name matches aren't cut off
@@ -636,10 +858,10 @@ def search_species_in_list(
             results.append(f"{sci} ({local})" if local else sci)
 
         # Add local-name matches not already captured by scientific search
-        for sci, local in labels.items():
+        for sci, local, local_lower in _local_name_index(labels):
             if sci in seen:
                 continue
-            if term_lower in local.lower():
+            if term_lower in local_lower:
                 seen.add(sci)
                 results.append(f"{sci} ({local})")
 
@@ -650,6 +872,24 @@ def search_species_in_list(
         return []
 
 
+# (labels dict, [(scientific_name, local_name, local_name.lower()), ...])
+_local_name_index_cache: Optional[Tuple[dict, List[Tuple[str, str, str]]]] = None
+
+
+def _local_name_index(labels: dict) -> List[Tuple[str, str, str]]:
+    """
+    Return labels as (scientific, local, local_lower) tuples.
+
+    Built once per labels dict (bird_language caches one dict per language),
+    so the per-keystroke search no longer lowercases every local name.
+    """
+    global _local_name_index_cache
+    if _local_name_index_cache is None or _local_name_index_cache[0] is not labels:
+        index = [(sci, local, local.lower()) for sci, local in labels.items()]
+        _local_name_index_cache = (labels, index)
+    return _local_name_index_cache[1]
+
+
 def get_db_completeness(db_path: Path) -> tuple[int, int]:
     """
     Return (completed_count, total_wav_count) for a folder's database.
@@ -661,7 +901,7 @@ def get_db_completeness(db_path: Path) -> tuple[int, int]:
         Tuple (completed, total). Returns (0, 0) if DB not readable.
     """
     try:
-        conn = get_db_connection(db_path)
+        conn = get_ro_connection(db_path)
         cursor = conn.execute("SELECT COUNT(*) FROM processing_status")
         completed = cursor.fetchone()[0]
         cursor = conn.execute("SELECT COUNT(*) FROM metadata")
@@ -27,7 +27,11 @@ from ..gui_elements.page_header import page_header
 from ..gui_elements.section_card import section_card
 from ..gui_elements.species_search import SpeciesSearch
 from ..player import AudioPlayer
-from ..db_queries import query_detections, get_recording_date_range
+from ..db_queries import (
+    query_detections,
+    get_detection_time_slots,
+    get_recording_date_range,
+)
 from ..bird_language import load_labels
 from ..task_status import run_with_loading, JS_TIMEOUT
 
@@ -118,13 +122,16 @@ def _get_state() -> AppState:
 # ---------------------------------------------------------------------------
 
 def aggregate_detections(
-    detections: List[Dict],
+    slot_rows: List[Tuple[str, int, int, float]],
     weight_by_confidence: bool,
     date_from: date,
     date_to: date,
 ) -> Dict[Tuple[str, int], Dict]:
     """
-    Aggregate detections into a (date_str, slot_idx) → cell dict.
+    Aggregate per-slot counts into a (date_str, slot_idx) → cell dict.
+
+    slot_rows come from db_queries.get_detection_time_slots, which already
+    grouped the detections in SQL: (date_str, slot_idx, count, sum_conf).
 
     Returns a dict keyed by (date_str "YYYY-MM-DD", slot_idx 0-47):
         {
@@ -144,22 +151,15 @@ def aggregate_detections(
             cells[(ds, slot)] = {"value": 0.0, "count": 0, "sum_conf": 0.0}
         cur += timedelta(days=1)
 
-    # Fill from detections
-    for det in detections:
-        ts_str = det.get("segment_start_local") or det.get("timestamp", "")
-        try:
-            ts = datetime.fromisoformat(ts_str)
-        except (ValueError, TypeError):
-            continue
-        ds = ts.date().isoformat()
-        slot = ts.hour * 2 + (1 if ts.minute >= 30 else 0)
+    # Fill from pre-aggregated slots
+    for ds, slot, count, sum_conf in slot_rows:
         key = (ds, slot)
         if key not in cells:
             continue  # outside requested range
         c = cells[key]
-        c["count"] += 1
-        c["sum_conf"] += det.get("confidence", 0.0)
-        c["value"] += det.get("confidence", 0.0) if weight_by_confidence else 1.0
+        c["count"] += count
+        c["sum_conf"] += sum_conf or 0.0
+        c["value"] += (sum_conf or 0.0) if weight_by_confidence else float(count)
 
     return cells
 
@@ -428,19 +428,14 @@ async def heatmap_page() -> None:
                 return
 
             try:
-                detections = await run_with_loading(
+                slot_rows = await run_with_loading(
                     apply_btn,
-                    lambda: query_detections(
+                    lambda: get_detection_time_slots(
                         db_path=state.active_db,
                         species=state.hm_filter_species or None,
                         date_from=datetime.combine(state.hm_filter_date_from, dt_time(0, 0)),
                         date_to=datetime.combine(state.hm_filter_date_to, dt_time(23, 59)),
                         min_confidence=state.hm_filter_confidence,
-                        limit=999_999,
-                        offset=0,
-                        sort_by="time",
-                        sort_order="asc",
-                        labels=labels,
                     ),
                     shared_state=state.shared_state,
                     label='Querying detections…',
@@ -450,13 +445,15 @@ async def heatmap_page() -> None:
                 ui.notify(f"Query error: {exc}", type="negative")
                 return
 
-            if not detections:
+            if not slot_rows:
                 ui.notify("No detections found for current filters.", type="warning")
                 apply_btn.props(remove="loading")
                 return
 
+            n_detections = sum(row[2] for row in slot_rows)
+
             cells = aggregate_detections(
-                detections,
+                slot_rows,
                 state.hm_weight_confidence,
                 state.hm_filter_date_from,
                 state.hm_filter_date_to,
@@ -497,7 +494,7 @@ async def heatmap_page() -> None:
 
             export_btn.enable()
             download_section.set_visibility(True)
-            ui.notify(f"Heatmap updated ({len(detections)} detections).", type="positive")
+            ui.notify(f"Heatmap updated ({n_detections} detections).", type="positive")
 
         apply_btn = ui.button("▶ Apply Filters", on_click=_apply_filters) \
             .props("no-caps color=primary").classes("q-mt-sm")
@@ -12,8 +12,7 @@ Sections:
 """
 
 import asyncio
-import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 from io import BytesIO, StringIO
 from pathlib import Path
 from typing import Dict, List, Optional, Set
@@ -28,6 +27,7 @@ from ..gui_elements.page_header import page_header
 from ..gui_elements.section_card import section_card
 from ..gui_elements.db_folder_tree import DbFolderTree
 from ..db_queries import (
+    get_ro_connection,
     get_species_list_with_counts,
     format_detections_column,
     species_list_exists,
@@ -283,7 +283,7 @@ def _get_loaded_db_paths(temp_db: Optional[Path]) -> Set[Path]:
     if temp_db is None or not temp_db.exists():
         return set()
     try:
-        conn = sqlite3.connect(temp_db)
+        conn = get_ro_connection(temp_db)
         rows = conn.execute("SELECT db_path FROM source_dbs").fetchall()
         conn.close()
         return {Path(r[0]).parent for r in rows}
@@ -308,8 +308,7 @@ def _query_aggregate_stats(temp_db: Path) -> dict:
         'total_duration_s': 0.0,
     }
     try:
-        conn = sqlite3.connect(temp_db)
-        conn.row_factory = sqlite3.Row
+        conn = get_ro_connection(temp_db)
 
         defaults['source_db_count'] = conn.execute(
             "SELECT COUNT(*) FROM source_dbs"
@@ -348,8 +347,7 @@ def _render_recording_files(state: AppState) -> None:
         return
 
     try:
-        conn = sqlite3.connect(db)
-        conn.row_factory = sqlite3.Row
+        conn = get_ro_connection(db)
         rows_raw = conn.execute("""
             SELECT
                 m.filename,
@@ -377,13 +375,13 @@ def _render_recording_files(state: AppState) -> None:
     ui.label(f'Total files: {len(rows_raw)}').classes('text-caption q-mb-xs')
 
     rows = []
+    fromiso = datetime.fromisoformat  # bound once, called per row
     for m in rows_raw:
         start = m['timestamp_local'] or '–'
         duration = m['duration_seconds'] or 0
         try:
-            start_dt = datetime.fromisoformat(start)
-            end_dt   = start_dt.replace(second=start_dt.second + int(duration))
-            end_str  = end_dt.strftime('%Y-%m-%d %H:%M:%S')
+            end_dt  = fromiso(start) + timedelta(seconds=duration)
+            end_str = end_dt.strftime('%Y-%m-%d %H:%M:%S')
         except Exception:
             end_str = '–'
         gps = (
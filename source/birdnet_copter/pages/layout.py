@@ -59,8 +59,8 @@ def _relative_db_label(app_state: AppState) -> str:
         pass
 
     try:
-        import sqlite3
-        conn = sqlite3.connect(db)
+        from ..db_queries import get_ro_connection
+        conn = get_ro_connection(db)
         count = conn.execute("SELECT COUNT(*) FROM source_dbs").fetchone()[0]
         if count == 1:
             row = conn.execute("SELECT display_name FROM source_dbs LIMIT 1").fetchone()
@@ -11,7 +11,6 @@ Entry point: run_scout_process()
 
 import contextlib
 import io
-import sqlite3
 import sys
 import time
 from datetime import datetime
@@ -35,6 +34,7 @@ from .config import (
 )
 from .database import (
     init_database,
+    open_connection,
     insert_metadata,
     batch_insert_detections,
     create_indices,
@@ -184,6 +184,8 @@ def _process_folder(
 
     metadata_map: dict[str, dict] = {}
 
+    conn = open_connection(str(db_path))
+
     if missing:
         for wav in wav_files:
             if wav.name not in missing:
@@ -191,13 +193,12 @@ def _process_folder(
             try:
                 meta = extract_metadata(str(wav))
                 meta['path'] = str(wav)
-                insert_metadata(str(db_path), meta)
+                insert_metadata(str(db_path), meta, conn=conn)
                 metadata_map[wav.name] = meta
             except Exception as e:
                 logger.error(f"Walker: metadata extraction failed for {wav.name}: {e}")
 
     # --- files not yet completed ---
-    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     cursor.execute("SELECT filename FROM processing_status")
     completed = {row[0] for row in cursor.fetchall()}
@@ -236,101 +237,106 @@ def _process_folder(
     # --- GPU/CPU device string ---
     device = 'GPU' if use_gpu else 'CPU'
 
-    # --- processing loop ---
-    for meta in files_to_process:
-        if stop_flag[0]:
-            logger.info("Scout: stop requested, aborting folder processing")
-            break
+    # --- processing loop (one writer connection for the whole folder) ---
+    conn = open_connection(str(db_path))
+    try:
+        for meta in files_to_process:
+            if stop_flag[0]:
+                logger.info("Scout: stop requested, aborting folder processing")
+                break
 
-        filename  = meta['filename']
-        file_path = meta['path']
+            filename  = meta['filename']
+            file_path = meta['path']
 
-        job.current_file = filename
-        _send_progress(bundle, job)
+            job.current_file = filename
+            _send_progress(bundle, job)
 
-        try:
-            # --- BirdNET analysis ---
-            bundle.shared_state['birdnet_active'] = True
             try:
-                with _capture_tf_output():
-                    detections = analyze_file(
-                        file_path,
-                        latitude=meta.get('gps_lat', 51.1657),
-                        longitude=meta.get('gps_lon', 13.7372),
-                        timestamp=meta['timestamp_utc'],
-                        min_confidence=job.min_conf,
-                        device=device,
-                    )
-            finally:
-                bundle.shared_state['birdnet_active'] = False
-
-            # --- embeddings (optional) ---
-            if job.scan_embeddings:
+                # --- BirdNET analysis ---
+                bundle.shared_state['birdnet_active'] = True
                 try:
-                    bundle.shared_state['birdnet_active'] = True
-                    try:
-                        emb_result = extract_embeddings(
+                    with _capture_tf_output():
+                        detections = analyze_file(
                             file_path,
-                            overlap_duration_s=OVERLAP_DURATION_S,
-                            batch_size=BATCH_SIZE,
+                            latitude=meta.get('gps_lat', 51.1657),
+                            longitude=meta.get('gps_lon', 13.7372),
+                            timestamp=meta['timestamp_utc'],
+                            min_confidence=job.min_conf,
                             device=device,
                         )
-                    finally:
-                        bundle.shared_state['birdnet_active'] = False
-
-                    emb_array  = emb_result.embeddings[0]  # shape (n_segments, 1024)
-                    delta_t    = emb_result.segment_duration_s
-                    step_width = emb_result.segment_duration_s - emb_result.overlap_duration_s
-
-                    # Build full array with zero vectors for segments without detections
-                    n_segments = emb_array.shape[0]
-                    segment_times = calculate_segment_times(
-                        n_segments,
-                        emb_result.segment_duration_s,
-                        emb_result.overlap_duration_s,
-                    )
-
-                    # Write to HDF5 (full array, zeros for empty segments)
-                    write_embeddings_to_hdf5(
-                        hdf5_path=hdf5_path,
-                        filename=filename,
-                        file_start_utc=meta['timestamp_utc'],
-                        embeddings_array=emb_array,
-                        segment_times=segment_times,
-                        delta_t=delta_t,
-                        step_width=step_width,
-                    )
-
-                except Exception as e:
-                    logger.error(f"Walker: embedding extraction failed for {filename}: {e}")
-                    job.files_done += 1
-                    _send_progress(bundle, job)
-                    continue
-
-            # --- write to DB ---
-            batch_insert_detections(
-                db_path=str(db_path),
-                filename=filename,
-                metadata=meta,
-                detections=detections,
-            )
-            # Mark file as completed (with or without detections)
-            set_file_status(str(db_path), filename, 'completed')
+                finally:
+                    bundle.shared_state['birdnet_active'] = False
 
-        except Exception as e:
-            logger.error(f"Scout: error processing {filename}: {e}")
+                # --- embeddings (optional) ---
+                if job.scan_embeddings:
+                    try:
+                        bundle.shared_state['birdnet_active'] = True
+                        try:
+                            emb_result = extract_embeddings(
+                                file_path,
+                                overlap_duration_s=OVERLAP_DURATION_S,
+                                batch_size=BATCH_SIZE,
+                                device=device,
+                            )
+                        finally:
+                            bundle.shared_state['birdnet_active'] = False
+
+                        emb_array  = emb_result.embeddings[0]  # shape (n_segments, 1024)
+                        delta_t    = emb_result.segment_duration_s
+                        step_width = emb_result.segment_duration_s - emb_result.overlap_duration_s
+
+                        # Build full array with zero vectors for segments without detections
+                        n_segments = emb_array.shape[0]
+                        segment_times = calculate_segment_times(
+                            n_segments,
+                            emb_result.segment_duration_s,
+                            emb_result.overlap_duration_s,
+                        )
 
-        job.files_done += 1
-        _send_progress(bundle, job)
+                        # Write to HDF5 (full array, zeros for empty segments)
+                        write_embeddings_to_hdf5(
+                            hdf5_path=hdf5_path,
+                            filename=filename,
+                            file_start_utc=meta['timestamp_utc'],
+                            embeddings_array=emb_array,
+                            segment_times=segment_times,
+                            delta_t=delta_t,
+                            step_width=step_width,
+                        )
 
-        # --- check control signals after each file ---
-        _check_control(bundle, stop_flag, wait_flag)
+                    except Exception as e:
+                        logger.error(f"Walker: embedding extraction failed for {filename}: {e}")
+                        job.files_done += 1
+                        _send_progress(bundle, job)
+                        continue
+
+                # --- write to DB ---
+                batch_insert_detections(
+                    db_path=str(db_path),
+                    filename=filename,
+                    metadata=meta,
+                    detections=detections,
+                    conn=conn,
+                )
+                # Mark file as completed (with or without detections)
+                set_file_status(str(db_path), filename, 'completed', conn=conn)
 
-        if wait_flag[0]:
-            _block_until_resume(bundle, job, stop_flag, wait_flag)
+            except Exception as e:
+                logger.error(f"Scout: error processing {filename}: {e}")
 
-        if stop_flag[0]:
-            break
+            job.files_done += 1
+            _send_progress(bundle, job)
+
+            # --- check control signals after each file ---
+            _check_control(bundle, stop_flag, wait_flag)
+
+            if wait_flag[0]:
+                _block_until_resume(bundle, job, stop_flag, wait_flag)
+
+            if stop_flag[0]:
+                break
+    finally:
+        conn.close()
 
     # --- create indices ---
     if not stop_flag[0]:
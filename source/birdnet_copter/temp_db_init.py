@@ -140,9 +140,12 @@ def _create_schema(conn: sqlite3.Connection) -> None:
         CREATE INDEX idx_detections_species
         ON detections(scientific_name)
     """)
+    # Covering index for time-range queries (heatmap slots): the range scan
+    # reads species, confidence and the metadata key from the index alone
     conn.execute("""
         CREATE INDEX idx_detections_segment_start
-        ON detections(segment_start_local)
+        ON detections(segment_start_local, scientific_name, confidence,
+                      filename, source_db_id)
     """)
     conn.execute("""
         CREATE INDEX idx_metadata_source
@@ -94,7 +94,12 @@ def _handle_add(temp_db_path: str, src_db_path: str, shared_state: dict, queue=N
     logger.info(f"TempDbProcess: adding {src_db_path}")
 
     try:
-        src_conn  = sqlite3.connect(src_db_path)
+        # Source DB is only read here (min_confidence). query_only instead of
+        # mode=ro: a mode=ro connection would leave -wal/-shm files behind.
+        src_conn  = sqlite3.connect(
+            f"{Path(src_db_path).absolute().as_uri()}?mode=rw", uri=True
+        )
+        src_conn.execute("PRAGMA query_only=ON")
         src_conn.row_factory = sqlite3.Row
         temp_conn = sqlite3.connect(temp_db_path)
         temp_conn.execute("PRAGMA journal_mode=WAL")
@@ -166,8 +171,11 @@ def _handle_add(temp_db_path: str, src_db_path: str, shared_state: dict, queue=N
             # Recreate indices and rebuild species_list only if queue is empty
             if queue is None or queue.empty():
                 temp_conn.execute("CREATE INDEX IF NOT EXISTS idx_detections_species ON detections(scientific_name)")
-                temp_conn.execute("CREATE INDEX IF NOT EXISTS idx_detections_segment_start ON detections(segment_start_local)")
+                temp_conn.execute("CREATE INDEX IF NOT EXISTS idx_detections_segment_start ON detections(segment_start_local, scientific_name, confidence, filename, source_db_id)")
                 temp_conn.execute("CREATE INDEX IF NOT EXISTS idx_detections_source ON detections(source_db_id)")
+                # Sampled statistics so the planner prefers the covering index
+                temp_conn.execute("PRAGMA analysis_limit=1000")
+                temp_conn.execute("ANALYZE")
                 temp_conn.commit()
                 _rebuild_species_list(temp_conn)
                 temp_conn.commit()
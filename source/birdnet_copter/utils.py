@@ -2,35 +2,59 @@
 Shared utility functions for Streamlit pages.
 """
 
+import os
+from itertools import islice
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 from loguru import logger
 
+DB_FILENAME = "birdnet_analysis.db"
+
 
 def find_databases_recursive(root_path: Path, max_results: int = 100) -> List[Path]:
     """
     Find all birdnet_analysis.db files recursively under root_path.
-    
+
+    Hidden directories (names starting with '.') are not descended into.
+
     Args:
         root_path: Root directory to search
         max_results: Maximum number of databases to find (default: 100)
-        
+
     Returns:
         Sorted list of database paths
     """
-    databases = []
-    
     try:
-        # Use rglob to recursively find all birdnet_analysis.db files
-        for db_path in root_path.rglob("birdnet_analysis.db"):
-            databases.append(db_path)
-            if len(databases) >= max_results:
-                logger.warning(f"Reached maximum of {max_results} databases, stopping search")
-                break
-        
+        databases = list(islice(_walk_databases(root_path), max_results + 1))
+
+        if len(databases) > max_results:
+            logger.warning(f"Reached maximum of {max_results} databases, stopping search")
+            databases = databases[:max_results]
+
         return sorted(databases)
-        
+
     except Exception as e:
         logger.error(f"Error searching for databases: {e}")
         return []
 
+
+def _walk_databases(path: Path | str) -> Iterator[Path]:
+    """
+    Depth-first os.scandir walk yielding every DB_FILENAME below path.
+
+    One directory read per folder; entries are classified from the dirent
+    type without extra stat() calls. Unreadable subdirectories are skipped.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except PermissionError:
+        logger.debug(f"Skipping unreadable directory: {path}")
+        return
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if not entry.name.startswith('.'):
+                yield from _walk_databases(entry.path)
+        elif entry.name == DB_FILENAME:
+            yield Path(entry.path)
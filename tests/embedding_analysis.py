@@ -28,10 +28,25 @@ import umap
 from sklearn.cluster import DBSCAN
 from sklearn.preprocessing import StandardScaler
 
+# Optional: GPU-DBSCAN via RAPIDS cuML (nur wenn CUDA + cuml installiert)
+try:
+    import cupy as cp
+    from cuml.cluster import DBSCAN as GPUDBSCAN
+    USE_GPU_DBSCAN = True
+except ImportError:
+    USE_GPU_DBSCAN = False
+
 # Visualization
 import plotly.express as px
 import plotly.graph_objects as go
 
+# Optional: Datashader für sehr große Punktwolken (Abschnitt 8)
+try:
+    import datashader as ds
+    HAVE_DATASHADER = True
+except ImportError:
+    HAVE_DATASHADER = False
+
 # Plotly Renderer für JupyterLab explizit setzen
 import plotly.io as pio
 pio.renderers.default = 'jupyterlab'
@@ -142,14 +157,35 @@ with h5py.File(HDF5_PATH, 'r') as f:
     # EFFIZIENTES LADEN: Nur benötigte Zeilen
     # HDF5 braucht sortierte Indices!
     
-    # 1. Original-Reihenfolge merken
-    original_order = np.argsort(np.argsort(embedding_indices))
+    # 1. Sortier-Permutation und ihre Inverse (O(n), ohne zweites argsort)
+    order = np.argsort(embedding_indices)
+    original_order = np.empty_like(order)
+    original_order[order] = np.arange(order.size)
     
     # 2. Indices sortieren
-    sorted_indices = np.sort(embedding_indices)
+    sorted_indices = embedding_indices[order]
     
     # 3. Embeddings in sortierter Reihenfolge laden
-    embeddings_sorted = dataset[sorted_indices]
+    if dataset.chunks:
+        # Chunkweise: jeder HDF5-Chunk wird genau einmal gelesen/dekomprimiert
+        # und die benötigten Zeilen daraus entnommen (statt Fancy-Indexing über alle)
+        chunk_rows = dataset.chunks[0]
+        chunk_ids = sorted_indices // chunk_rows
+        _, starts = np.unique(chunk_ids, return_index=True)
+        ends = np.append(starts[1:], len(sorted_indices))
+
+        embeddings_sorted = np.empty((len(sorted_indices), dataset.shape[1]), dtype=dataset.dtype)
+        for lo, hi in zip(starts, ends):
+            base = int(chunk_ids[lo]) * chunk_rows
+            block = dataset[base:base + chunk_rows]
+            embeddings_sorted[lo:hi] = block[sorted_indices[lo:hi] - base]
+
+        print(f"  Gelesene Chunks: {len(starts)} (Chunkgröße {chunk_rows})")
+    else:
+        # Nicht gechunkt (contiguous): Fancy-Indexing über die eindeutigen,
+        # sortierten Indices – nur diese Zeilen werden gelesen
+        unique_indices, inverse = np.unique(sorted_indices, return_inverse=True)
+        embeddings_sorted = dataset[unique_indices][inverse]
     
     # 4. Zurück in ursprüngliche Reihenfolge bringen
     embeddings = embeddings_sorted[original_order]
@@ -213,42 +249,61 @@ DBSCAN_MIN_SAMPLES = 10    # 5-20: größer = strenger (mehr Noise)
 print(f"Starte DBSCAN Clustering...")
 print(f"Parameter: eps={DBSCAN_EPS}, min_samples={DBSCAN_MIN_SAMPLES}")
 
-# DBSCAN auf UMAP-2D-Space
-clusterer = DBSCAN(
-    eps=DBSCAN_EPS,
-    min_samples=DBSCAN_MIN_SAMPLES,
-    metric='euclidean'
-)
-
-cluster_labels = clusterer.fit_predict(embedding_2d)
-
-# Statistiken
-n_clusters = len(set(cluster_labels)) - (1 if -1 in cluster_labels else 0)
-n_noise = list(cluster_labels).count(-1)
+# C-contiguous float32, damit sklearn ohne internes Kopieren/Casten rechnet
+embedding_2d = np.ascontiguousarray(embedding_2d, dtype=np.float32)
+
+# DBSCAN auf UMAP-2D-Space (GPU wenn verfügbar, sonst CPU)
+if USE_GPU_DBSCAN:
+    print("  Backend: cuML (GPU)")
+    clusterer = GPUDBSCAN(
+        eps=DBSCAN_EPS,
+        min_samples=DBSCAN_MIN_SAMPLES,
+        metric='euclidean',
+        output_type='numpy'
+    )
+    cluster_labels = clusterer.fit_predict(cp.asarray(embedding_2d))
+else:
+    print("  Backend: scikit-learn (CPU)")
+    clusterer = DBSCAN(
+        eps=DBSCAN_EPS,
+        min_samples=DBSCAN_MIN_SAMPLES,
+        metric='euclidean',
+        algorithm='kd_tree',   # 2D-Daten: Range-Queries über KD-Tree statt Brute-Force
+        leaf_size=32,
+        n_jobs=-1
+    )
+    cluster_labels = clusterer.fit_predict(embedding_2d)
+
+# Statistiken (ein vektorisierter Durchlauf statt list(...).count() pro Label)
+unique_labels, label_counts = np.unique(cluster_labels, return_counts=True)
+n_noise = int(label_counts[unique_labels == -1].sum())
+n_clusters = len(unique_labels) - (1 if n_noise else 0)
 
 print(f"\n✓ Clustering abgeschlossen:")
 print(f"  Anzahl Cluster: {n_clusters}")
 print(f"  Noise-Punkte: {n_noise} ({n_noise/len(cluster_labels)*100:.1f}%)")
 print(f"  Cluster-Sizes:")
-for label in sorted(set(cluster_labels)):
+for label, count in zip(unique_labels, label_counts):
     if label == -1:
         continue
-    count = list(cluster_labels).count(label)
     print(f"    Cluster {label}: {count} Detections")
 
 # %% [markdown]
 # ## 7. Daten für Visualisierung vorbereiten
 
 # %%
-# DataFrame für Plotly erstellen
-plot_df = detections_df.copy()
-plot_df['umap_x'] = embedding_2d[:, 0]
-plot_df['umap_y'] = embedding_2d[:, 1]
+# DataFrame für Plotly erstellen – nur die Spalten, die Hover/Statistik/Export brauchen
+plot_df = detections_df[['id', 'confidence', 'filename', 'segment_start_local']].copy()
+plot_df.reset_index(drop=True, inplace=True)
+# float32 statt float64: halbiert Speicher und JSON-Payload für Plotly
+plot_df['umap_x'] = embedding_2d[:, 0].astype(np.float32, copy=False)
+plot_df['umap_y'] = embedding_2d[:, 1].astype(np.float32, copy=False)
+plot_df['confidence'] = plot_df['confidence'].astype(np.float32)
 plot_df['cluster'] = cluster_labels
 
-# Cluster-Label als String (für bessere Plotly-Legende)
-plot_df['cluster_label'] = plot_df['cluster'].apply(
-    lambda x: 'Noise' if x == -1 else f'Cluster {x}'
+# Cluster-Label als String (für bessere Plotly-Legende), vektorisiert
+plot_df['cluster_label'] = ('Cluster ' + plot_df['cluster'].astype(str)).where(
+    plot_df['cluster'] != -1, 'Noise'
 )
 
 print(f"✓ Plot-DataFrame vorbereitet: {len(plot_df)} Zeilen")
@@ -260,9 +315,25 @@ plot_df.head()
 # **Hover-Infos:** Detection-ID, Confidence, Cluster, Filename, Zeit
 
 # %%
+# Ab dieser Punktzahl wird die Wolke mit Datashader vorgerastert (falls installiert);
+# Plotly bekommt dann nur die HOVER_SAMPLE_SIZE Detections mit höchster Confidence
+DATASHADER_THRESHOLD = 50_000
+HOVER_SAMPLE_SIZE = 5_000
+
+use_datashader = HAVE_DATASHADER and len(plot_df) > DATASHADER_THRESHOLD
+scatter_df = plot_df.nlargest(HOVER_SAMPLE_SIZE, 'confidence') if use_datashader else plot_df
+
+# Feste Farbe pro Cluster, damit Raster und Scatter-Layer übereinstimmen
+cluster_names = sorted(plot_df['cluster_label'].unique())
+palette = px.colors.qualitative.Plotly
+color_map = {
+    name: ('lightgray' if name == 'Noise' else palette[i % len(palette)])
+    for i, name in enumerate(cluster_names)
+}
+
 # Plotly Scatter Plot
 fig = px.scatter(
-    plot_df,
+    scatter_df,
     x='umap_x',
     y='umap_y',
     color='cluster_label',
@@ -276,10 +347,12 @@ fig = px.scatter(
         'umap_y': False,
         'cluster_label': False  # Steht schon in Legende
     },
+    color_discrete_map=color_map,
     title=f"UMAP Projektion: {SPECIES_NAME} ({len(plot_df)} Detections, {n_clusters} Cluster)",
     labels={'umap_x': 'UMAP Dimension 1', 'umap_y': 'UMAP Dimension 2'},
     width=1200,
-    height=800
+    height=800,
+    render_mode='webgl'  # Scattergl: ein WebGL-Kontext statt SVG-Knoten pro Punkt
 )
 
 # Noise-Punkte kleiner und grau
@@ -288,6 +361,28 @@ fig.for_each_trace(
     if trace.name == 'Noise' else ()
 )
 
+if use_datashader:
+    # Alle Punkte in einem NumPy-Aggregationsdurchlauf rastern und als Hintergrundbild einsetzen
+    x_range = (float(plot_df['umap_x'].min()), float(plot_df['umap_x'].max()))
+    y_range = (float(plot_df['umap_y'].min()), float(plot_df['umap_y'].max()))
+    cvs = ds.Canvas(plot_width=1200, plot_height=800, x_range=x_range, y_range=y_range)
+    agg = cvs.points(
+        plot_df[['umap_x', 'umap_y', 'cluster_label']].astype({'cluster_label': 'category'}),
+        'umap_x', 'umap_y', ds.count_cat('cluster_label')
+    )
+    img = ds.tf.shade(agg, color_key=color_map, how='eq_hist')
+
+    fig.add_layout_image(dict(
+        source=img.to_pil(),
+        xref='x', yref='y',
+        x=x_range[0], y=y_range[1],
+        sizex=x_range[1] - x_range[0], sizey=y_range[1] - y_range[0],
+        sizing='stretch', layer='below'
+    ))
+    fig.update_xaxes(range=x_range)
+    fig.update_yaxes(range=y_range)
+    print(f"Datashader: {len(plot_df)} Punkte gerastert, Hover für Top-{len(scatter_df)} nach Confidence")
+
 fig.update_layout(
     legend=dict(title='Cluster'),
     hovermode='closest'
@@ -304,14 +399,14 @@ print("  Tipp: Zoom, Pan, Hover über Punkte für Details")
 # Detaillierte Analyse der gefundenen Cluster
 
 # %%
-# Statistiken pro Cluster berechnen
-cluster_stats = plot_df.groupby('cluster_label').agg({
-    'id': 'count',
-    'confidence': ['mean', 'std', 'min', 'max']
-}).round(3)
-
-cluster_stats.columns = ['Count', 'Avg_Conf', 'Std_Conf', 'Min_Conf', 'Max_Conf']
-cluster_stats = cluster_stats.sort_values('Count', ascending=False)
+# Statistiken pro Cluster berechnen (Named Aggregation, kein MultiIndex-Umbau)
+cluster_stats = plot_df.groupby('cluster_label').agg(
+    Count=('id', 'size'),
+    Avg_Conf=('confidence', 'mean'),
+    Std_Conf=('confidence', 'std'),
+    Min_Conf=('confidence', 'min'),
+    Max_Conf=('confidence', 'max'),
+).sort_values('Count', ascending=False, kind='stable').round(3)
 
 print("Cluster-Statistiken:")
 print(cluster_stats)
@@ -338,9 +433,11 @@ print("✓ Gespeichert: /workspace/embedding_plot.html")
 # Für jeden Cluster: Top 3 Detections nach Confidence
 print("Top-3 Detections pro Cluster (nach Confidence):\n")
 
-for label in sorted(set(cluster_labels)):
+# Einmal sortieren, dann gruppenweise head(3) statt Filter + nlargest pro Cluster
+top3 = plot_df.sort_values('confidence', ascending=False).groupby('cluster', sort=False).head(3)
+
+for label, cluster_data in top3.groupby('cluster'):
     cluster_name = 'Noise' if label == -1 else f'Cluster {label}'
-    cluster_data = plot_df[plot_df['cluster'] == label].nlargest(3, 'confidence')
     
     print(f"\n{cluster_name}:")
     print("-" * 80)
@@ -358,7 +455,13 @@ for label in sorted(set(cluster_labels)):
 output_file = Path(RECORDING_FOLDER) / f"{SPECIES_NAME.replace(' ', '_')}_clusters.csv"
 
 export_df = plot_df[['id', 'filename', 'segment_start_local', 'confidence', 'cluster', 'cluster_label']]
-export_df.to_csv(output_file, index=False)
+try:
+    # Arrow-CSV-Writer (C++, multithreaded) – pyarrow ist optional
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    pacsv.write_csv(pa.Table.from_pandas(export_df, preserve_index=False), str(output_file))
+except ImportError:
+    export_df.to_csv(output_file, index=False)
 
 print(f"✓ Cluster-Zuordnungen exportiert nach:")
 print(f"  {output_file}")
@@ -22,6 +22,7 @@ import sqlite3
 from pathlib import Path
 from collections import defaultdict
 import numpy as np
+import pandas as pd
 import h5py
 
 
@@ -49,6 +50,38 @@ class EmbeddingConsistencyTest:
         print(f"  SQLite: {self.db_path.name}")
         print(f"  HDF5:   {self.hdf5_path.name}")
         print()
+        
+        self._ensure_indices()
+    
+    def _ensure_indices(self):
+        """
+        Create the indices the test queries filter and group on.
+        
+        Without them every test does a full scan of detections. This is the
+        only write; the tests themselves use read-only connections.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.executescript("""
+                CREATE INDEX IF NOT EXISTS idx_det_emb
+                    ON detections(embedding_idx);
+                -- Covering: the time-consistency GROUP BY reads only this index
+                CREATE INDEX IF NOT EXISTS idx_det_time_emb
+                    ON detections(segment_start_local, segment_end_local, embedding_idx);
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a read-only connection to the SQLite DB.
+        
+        query_only instead of mode=ro, so closing removes -wal/-shm again.
+        """
+        conn = sqlite3.connect(f"{self.db_path.absolute().as_uri()}?mode=rw", uri=True)
+        conn.execute("PRAGMA query_only=ON")
+        return conn
     
     def run_all_tests(self):
         """Run all validation tests."""
@@ -91,7 +124,8 @@ class EmbeddingConsistencyTest:
     
     def test_hdf5_integrity(self):
         """Test HDF5 file structure and data integrity."""
-        with h5py.File(self.hdf5_path, 'r') as f:
+        # Chunk cache large enough that the sampled rows decompress each chunk once
+        with h5py.File(self.hdf5_path, 'r', rdcc_nbytes=64*1024*1024, rdcc_nslots=10007) as f:
             # Check dataset exists
             assert 'embeddings' in f, "Dataset 'embeddings' not found in HDF5"
             
@@ -109,31 +143,31 @@ class EmbeddingConsistencyTest:
             # Check dtype
             assert dtype == np.float32, f"Expected float32, got {dtype}"
             
-            # Check for NaN/Inf (sample first and last 10 rows)
-            sample_indices = list(range(min(10, shape[0]))) + \
-                           list(range(max(0, shape[0]-10), shape[0]))
+            # Check for NaN/Inf (sample first and last 10 rows).
+            # One fancy-indexed read (h5py needs sorted, unique indices)
+            # and one isfinite pass instead of a read per row.
+            sample_indices = np.unique(np.concatenate([
+                np.arange(min(10, shape[0])),
+                np.arange(max(0, shape[0]-10), shape[0]),
+            ]))
+            if sample_indices.size == 0:
+                return
             
-            for idx in sample_indices:
-                embedding = dataset[idx]
-                assert not np.any(np.isnan(embedding)), f"NaN found at index {idx}"
-                assert not np.any(np.isinf(embedding)), f"Inf found at index {idx}"
+            sample = dataset[sample_indices, :]
+            finite = np.isfinite(sample).all(axis=1)
+            assert finite.all(), \
+                f"NaN/Inf found at index {int(sample_indices[np.argmin(finite)])}"
     
     def test_sqlite_indices(self):
         """Test SQLite embedding_idx column."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
-        # Count total detections
-        cursor.execute("SELECT COUNT(*) FROM detections")
-        total_detections = cursor.fetchone()[0]
-        
-        # Count detections with embeddings
-        cursor.execute("SELECT COUNT(*) FROM detections WHERE embedding_idx IS NOT NULL")
-        detections_with_emb = cursor.fetchone()[0]
-        
-        # Count detections without embeddings
-        cursor.execute("SELECT COUNT(*) FROM detections WHERE embedding_idx IS NULL")
-        detections_without_emb = cursor.fetchone()[0]
+        # Count total detections and those with embeddings in one scan
+        # (COUNT(embedding_idx) skips NULLs)
+        cursor.execute("SELECT COUNT(*), COUNT(embedding_idx) FROM detections")
+        total_detections, detections_with_emb = cursor.fetchone()
+        detections_without_emb = total_detections - detections_with_emb
         
         print(f"    Total detections: {total_detections}")
         print(f"    With embeddings: {detections_with_emb}")
@@ -152,7 +186,7 @@ class EmbeddingConsistencyTest:
             n_embeddings = f['embeddings'].shape[0]
         
         # Get index range from SQLite
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -178,77 +212,66 @@ class EmbeddingConsistencyTest:
     
     def test_time_consistency(self):
         """Test that detections with same time have same embedding_idx."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
-        # Group by time, get embedding indices
+        # Inconsistency is detected entirely in SQLite: only time groups
+        # with more than one distinct embedding_idx are returned
         cursor.execute("""
-            SELECT segment_start_local, segment_end_local, 
-                   GROUP_CONCAT(embedding_idx) as indices,
+            SELECT segment_start_local, segment_end_local,
+                   COUNT(DISTINCT embedding_idx) as d,
                    COUNT(*) as cnt
             FROM detections
             WHERE embedding_idx IS NOT NULL
             GROUP BY segment_start_local, segment_end_local
-            HAVING cnt > 1
+            HAVING cnt > 1 AND d > 1
         """)
         
-        time_groups = cursor.fetchall()
+        inconsistent = cursor.fetchall()
         conn.close()
         
-        print(f"    Time segments with multiple detections: {len(time_groups)}")
-        
-        inconsistent = []
-        for start, end, indices_str, cnt in time_groups:
-            indices = [int(x) for x in indices_str.split(',')]
-            unique_indices = set(indices)
-            
-            if len(unique_indices) > 1:
-                inconsistent.append((start, end, unique_indices))
-        
         if inconsistent:
             print(f"    ✗ Found {len(inconsistent)} time segments with different indices:")
-            for start, end, indices in inconsistent[:5]:  # Show first 5
-                print(f"      {start} - {end}: indices {indices}")
+            for start, end, n_distinct, cnt in inconsistent[:5]:  # Show first 5
+                print(f"      {start} - {end}: {n_distinct} distinct indices in {cnt} detections")
         
         assert len(inconsistent) == 0, \
             f"Found {len(inconsistent)} time segments with inconsistent embedding indices"
     
     def test_no_orphans(self):
         """Test that no embeddings in HDF5 are orphaned (unused)."""
-        # Get all used indices from SQLite
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Get HDF5 size
+        with h5py.File(self.hdf5_path, 'r') as f:
+            n_embeddings = f['embeddings'].shape[0]
         
-        cursor.execute("""
-            SELECT DISTINCT embedding_idx
+        # Get all used indices from SQLite straight into a numpy array
+        conn = self._connect()
+        cursor = conn.execute("""
+            SELECT embedding_idx
             FROM detections
             WHERE embedding_idx IS NOT NULL
-            ORDER BY embedding_idx
         """)
-        
-        used_indices = set(row[0] for row in cursor.fetchall())
+        idx_arr = np.fromiter((row[0] for row in cursor), dtype=np.int64)
         conn.close()
         
-        # Get HDF5 size
-        with h5py.File(self.hdf5_path, 'r') as f:
-            n_embeddings = f['embeddings'].shape[0]
-        
-        # Check if all HDF5 indices are used
-        all_indices = set(range(n_embeddings))
-        orphaned = all_indices - used_indices
+        # Mark used indices in a bool array (out-of-range ones are Test 3's job)
+        used = np.zeros(n_embeddings, dtype=bool)
+        used[idx_arr[(idx_arr >= 0) & (idx_arr < n_embeddings)]] = True
+        n_used = int(used.sum())
+        n_orphaned = n_embeddings - n_used
         
         print(f"    Total embeddings in HDF5: {n_embeddings}")
-        print(f"    Used by detections: {len(used_indices)}")
-        print(f"    Orphaned embeddings: {len(orphaned)}")
+        print(f"    Used by detections: {n_used}")
+        print(f"    Orphaned embeddings: {n_orphaned}")
         
         # Allow small percentage of orphans (due to filtering edge cases)
-        orphan_ratio = len(orphaned) / n_embeddings if n_embeddings > 0 else 0
+        orphan_ratio = n_orphaned / n_embeddings if n_embeddings > 0 else 0
         assert orphan_ratio < 0.05, \
             f"Too many orphaned embeddings: {orphan_ratio*100:.1f}% (expected < 5%)"
     
     def test_segmentation(self):
         """Test segmentation consistency (3s segments, correct overlap)."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Get analysis config
@@ -256,45 +279,39 @@ class EmbeddingConsistencyTest:
         lang = cursor.fetchone()
         
         # Get sample of detections with times
-        cursor.execute("""
-            SELECT segment_start_local, segment_end_local, embedding_idx
+        df = pd.read_sql_query("""
+            SELECT segment_start_local, segment_end_local
             FROM detections
             WHERE embedding_idx IS NOT NULL
             ORDER BY segment_start_local
             LIMIT 100
-        """)
-        
-        detections = cursor.fetchall()
+        """, conn, parse_dates={
+            'segment_start_local': {'format': 'ISO8601', 'utc': True},
+            'segment_end_local': {'format': 'ISO8601', 'utc': True},
+        })
         conn.close()
         
-        if not detections:
+        if df.empty:
             print(f"    No detections to test")
             return
         
-        print(f"    Testing {len(detections)} sample detections...")
-        
-        # Parse times and calculate durations
-        from datetime import datetime
+        print(f"    Testing {len(df)} sample detections...")
         
-        durations = []
-        for start_str, end_str, idx in detections:
-            start = datetime.fromisoformat(start_str)
-            end = datetime.fromisoformat(end_str)
-            duration = (end - start).total_seconds()
-            durations.append(duration)
+        # Calculate durations (vectorized; times already parsed by read_sql_query)
+        durations = (df['segment_end_local'] - df['segment_start_local']).dt.total_seconds().to_numpy()
         
         # Check if all durations are ~3.0s (within 0.1s tolerance)
         expected_duration = 3.0
         tolerance = 0.1
         
-        invalid_durations = [d for d in durations if abs(d - expected_duration) > tolerance]
+        invalid_durations = int((np.abs(durations - expected_duration) > tolerance).sum())
         
         print(f"    Average duration: {np.mean(durations):.3f}s")
-        print(f"    Min/Max duration: {min(durations):.3f}s / {max(durations):.3f}s")
-        print(f"    Invalid durations: {len(invalid_durations)}")
+        print(f"    Min/Max duration: {durations.min():.3f}s / {durations.max():.3f}s")
+        print(f"    Invalid durations: {invalid_durations}")
         
-        assert len(invalid_durations) == 0, \
-            f"Found {len(invalid_durations)} detections with invalid duration (expected ~3.0s)"
+        assert invalid_durations == 0, \
+            f"Found {invalid_durations} detections with invalid duration (expected ~3.0s)"
 
 
 def main():